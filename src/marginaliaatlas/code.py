@@ -3,7 +3,12 @@ import json
 import tkinter as tk
 from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
-from collections import defaultdict
+from functools import partial
+
+try:
+    import orjson  # optional ("fast" extra); stdlib json is the fallback
+except ImportError:
+    orjson = None
 
 
 # ============================================================
@@ -11,6 +16,9 @@ from collections import defaultdict
 # ============================================================
 
 G_INV = {}          # id -> inventory record
+G_INV_KEYS = []     # sorted(G_INV), computed once per load_inventory()
+G_MODULE_INDEX = {} # module -> [id, ...], computed once per load_inventory()
+G_UNGROUPED = []    # sorted ids with no module, computed alongside G_MODULE_INDEX
 G_ATTACH = {}       # id -> attachment metadata
 
 G_DRAG = {
@@ -19,7 +27,15 @@ G_DRAG = {
     "y": 0,
     "handle": None,
     "corner": None,
-    "mode": None  # "item" | "pan"
+    "mode": None,  # "item" | "pan"
+
+    "dx": 0,  # item drag delta not yet applied (see flush_drag)
+    "dy": 0,
+    "flush_pending": False,
+    "moved": False,  # an item drag has changed some bbox since the press
+
+    "pan_rem_x": 0,  # pan motion (in zoom_den/zoom_num units) not yet
+    "pan_rem_y": 0,  # big enough to move the camera by a whole unit
 }
 
 G_PANES = {
@@ -30,7 +46,7 @@ G_PANES = {
 
 g = {
     "module_highlight": None,  # module name or None
-    "hover_canvas_item": None,  # formerly G_HOVER["canvas_item"]
+    "canvas_cursor": "",  # cursor last sent to the canvas
 
     "cam_x": 0,  # camera X, Y position
     "cam_y": 0,
@@ -38,7 +54,15 @@ g = {
     "zoom_den": 1,  # zoom denominator
 
     "canvas_view_w": 0,  # We record this, because Tk is weirdly forgetful
-    "canvas_view_h": 0
+    "canvas_view_h": 0,
+
+    "camera_dirty": True,  # camera/zoom/view changed since last apply_view()
+    "view_applied": None,  # (cam_x, cam_y, zoom_num, zoom_den, view_w, view_h) drawn
+    "sync_pending": False,  # schedule_sync_all() has an after_idle queued
+
+    "grid_rank": 0,  # next stacking rank handed out by grid_insert()
+    "json_view_after": None,  # pending render_json_view() after-id, if any
+    "json_view_item": None,  # item_id the text pane currently shows, if any
 }
 
 widgets = {
@@ -98,7 +122,6 @@ selection_set = set()  # set of item ids that are selected
 #       # *should* look like for this item this frame.
 #       # In Phase 3, ONLY the renderer reads these and applies them.
 #
-#       "rect_coords": (x0, y0, x1, y1),     # projected rectangle geometry
 #       "rect_outline": "white",             # outline color
 #       "rect_width": 1,                     # outline width (pixels)
 #       "rect_fill": "#88ccff",              # fill color
@@ -106,10 +129,28 @@ selection_set = set()  # set of item ids that are selected
 #       "label_coord": (x, y),               # projected label position
 #       "label_text": "A",                   # text content
 #       "label_color": "white",              # text color
+#
+#       # ============================================================
+#       # Render bookkeeping (renderer only)
+#       # ============================================================
+#       # What was last sent to Tk, so unchanged items cost no Tk calls.
+#
+#       "geom_dirty": True,                  # bbox changed (store_rect)
+#       "rect_style_applied": (outline, width, fill) or None,
+#       "label_coord_applied": (x, y) or None,
+#       "label_style_applied": (text, color) or None,
 #   }
 #
 G_CANVAS = {}
 
+# Reverse index of G_CANVAS: canvas object id -> item_id.
+# Maintained by the renderer wherever canvas objects are created or deleted,
+# so its keys are exactly the live "rendered" canvas objects.
+G_CANVAS_OWNER = {}
+
+# Corner tag of each live handle: canvas object id -> "nw" | "ne" | "se" | "sw"
+G_HANDLE_CORNER = {}
+
 
 # ============================================================
 # Register (CUR) Support
@@ -134,28 +175,37 @@ CUR = {
 }
 
 def iterate_item(item_id):
+    cur = CUR  # local alias
     if item_id is None:
-        CUR["item_id"] = None
-        CUR["item_canvas_data"] = None
-        CUR["item_attachment_data"] = None
-        CUR["item_inv"] = None
-        CUR["item_modules"] = []
+        cur["item_id"] = None
+        cur["item_canvas_data"] = None
+        cur["item_attachment_data"] = None
+        cur["item_inv"] = None
+        cur["item_modules"] = []
     else:
-        CUR["item_id"] = item_id
-        CUR["item_canvas_data"] = G_CANVAS.get(item_id)
-        CUR["item_attachment_data"] = G_ATTACH.get(item_id)
         inv = G_INV.get(item_id)
-        CUR["item_inv"] = inv
-        CUR["item_modules"] = inv.get("modules", []) if inv else []
-
-def has_handles():
-    D = CUR["item_canvas_data"]
-    return bool(D and D.get("handles"))
-
-def foreach_item(fn):
-    for item_id in G_CANVAS:
-        iterate_item(item_id)
-        fn()
+        cur["item_id"] = item_id
+        cur["item_canvas_data"] = G_CANVAS.get(item_id)
+        cur["item_attachment_data"] = G_ATTACH.get(item_id)
+        cur["item_inv"] = inv
+        cur["item_modules"] = inv.get("modules", []) if inv else []
+
+def foreach_item(*fns):
+    """Point CUR at each attached item in turn and call fns, in order."""
+    # iterate_item() inlined: this loop runs once per item per sync, and
+    # G_CANVAS already hands over each entry without a second lookup
+    cur = CUR
+    attach_get = G_ATTACH.get
+    inv_get = G_INV.get
+    for item_id, D in G_CANVAS.items():
+        inv = inv_get(item_id)
+        cur["item_id"] = item_id
+        cur["item_canvas_data"] = D
+        cur["item_attachment_data"] = attach_get(item_id)
+        cur["item_inv"] = inv
+        cur["item_modules"] = inv.get("modules", []) if inv else []
+        for fn in fns:
+            fn()
 
 
 # ============================================================
@@ -192,14 +242,15 @@ def load_rect(src):
         CUR["x0"], CUR["y0"], CUR["x1"], CUR["y1"] set
         CUR["coord_type"] set to "w"
     """
+    cur = CUR  # local alias
     if src == "attachment":
-        item_id = CUR["item_id"]
+        item_id = cur["item_id"]
         x0, y0, x1, y1 = G_ATTACH[item_id]["bbox"]
-        CUR["x0"] = x0
-        CUR["y0"] = y0
-        CUR["x1"] = x1
-        CUR["y1"] = y1
-        CUR["coord_type"] = "w"
+        cur["x0"] = x0
+        cur["y0"] = y0
+        cur["x1"] = x1
+        cur["y1"] = y1
+        cur["coord_type"] = "w"
     else:
         raise ValueError(f"load_rect: unknown src '{src}'")
 
@@ -216,22 +267,37 @@ def store_rect(dst):
 
     Effects:
         World geometry updated from rect registers.
+        The item's render geometry is marked dirty (G_CANVAS "geom_dirty").
     """
+    cur = CUR  # local alias
     if dst == "attachment":
-        if CUR.get("coord_type") != "w":
+        if cur.get("coord_type") != "w":
             raise RuntimeError("store_rect: coord_type must be 'w' to store to attachment")
         
-        item_id = CUR["item_id"]
+        item_id = cur["item_id"]
         G_ATTACH[item_id]["bbox"] = (
-            CUR["x0"],
-            CUR["y0"],
-            CUR["x1"],
-            CUR["y1"],
+            cur["x0"],
+            cur["y0"],
+            cur["x1"],
+            cur["y1"],
         )
+
+        D = G_CANVAS.get(item_id)
+        if D is not None:
+            D["geom_dirty"] = True
     else:
         raise ValueError(f"store_rect: unknown dst '{dst}'")
 
 
+# corner name -> (x register, y register) of the rect register
+_CORNER_REGS = {
+    "nw": ("x0", "y0"),
+    "ne": ("x1", "y0"),
+    "se": ("x1", "y1"),
+    "sw": ("x0", "y1"),
+}
+
+
 def load_pt(src):
     """
     Load point into point registers.
@@ -246,36 +312,34 @@ def load_pt(src):
         CUR["x"], CUR["y"] set
         coord space unchanged (except "event" which sets to "c")
     """
+    cur = CUR  # local alias
+
+    # corners first: one table hit (handle drags load one per motion)
+    corner = _CORNER_REGS.get(src)
+    if corner:
+        xr, yr = corner
+        cur["x"] = cur[xr]
+        cur["y"] = cur[yr]
+        return
+
     if src == "event":
-        ev = CUR.get("event")
+        ev = cur.get("event")
         if ev is None:
             raise RuntimeError("load_pt('event'): no event in CUR")
-        CUR["x"] = ev.x
-        CUR["y"] = ev.y
-        CUR["coord_type"] = "c"
-        return
-
-    x0 = CUR["x0"]; y0 = CUR["y0"]; x1 = CUR["x1"]; y1 = CUR["y1"]
+        cur["x"] = ev.x
+        cur["y"] = ev.y
+        cur["coord_type"] = "c"
 
-    if src == "center":
-        CUR["x"] = (x0 + x1) // 2
-        CUR["y"] = (y0 + y1) // 2
+    elif src == "center":
+        cur["x"] = (cur["x0"] + cur["x1"]) // 2
+        cur["y"] = (cur["y0"] + cur["y1"]) // 2
     elif src == "center-south":
-        CUR["x"] = (x0 + x1) // 2
-        CUR["y"] = y1
-
-    elif src == "nw":
-        CUR["x"] = x0; CUR["y"] = y0
-    elif src == "ne":
-        CUR["x"] = x1; CUR["y"] = y0
-    elif src == "se":
-        CUR["x"] = x1; CUR["y"] = y1
-    elif src == "sw":
-        CUR["x"] = x0; CUR["y"] = y1
+        cur["x"] = (cur["x0"] + cur["x1"]) // 2
+        cur["y"] = cur["y1"]
 
     elif src == "label":
-        CUR["x"], CUR["y"] = CUR["item_canvas_data"]["label_coord"]
-        CUR["coord_type"] = "w"
+        cur["x"], cur["y"] = cur["item_canvas_data"]["label_coord"]
+        cur["coord_type"] = "w"
 
     else:
         raise ValueError(f"load_pt: unknown src '{src}'")
@@ -292,29 +356,27 @@ def store_pt(dst):
         Updates rect registers based on point registers.
         coord space unchanged.
     """
-    x = CUR["x"]; y = CUR["y"]
+    cur = CUR  # local alias
+    x = cur["x"]; y = cur["y"]
+
+    corner = _CORNER_REGS.get(dst)
+    if corner:
+        xr, yr = corner
+        cur[xr] = x
+        cur[yr] = y
+        return
 
     if dst == "center":
         # move entire rect so its center becomes (x, y)
-        x0 = CUR["x0"]; y0 = CUR["y0"]; x1 = CUR["x1"]; y1 = CUR["y1"]
+        x0 = cur["x0"]; y0 = cur["y0"]; x1 = cur["x1"]; y1 = cur["y1"]
         cx = (x0 + x1) / 2
         cy = (y0 + y1) / 2
         dx = x - cx
         dy = y - cy
-        CUR["x0"] = x0 + dx
-        CUR["y0"] = y0 + dy
-        CUR["x1"] = x1 + dx
-        CUR["y1"] = y1 + dy
-        return
-
-    if dst == "nw":
-        CUR["x0"] = x; CUR["y0"] = y
-    elif dst == "ne":
-        CUR["x1"] = x; CUR["y0"] = y
-    elif dst == "se":
-        CUR["x1"] = x; CUR["y1"] = y
-    elif dst == "sw":
-        CUR["x0"] = x; CUR["y1"] = y
+        cur["x0"] = x0 + dx
+        cur["y0"] = y0 + dy
+        cur["x1"] = x1 + dx
+        cur["y1"] = y1 + dy
     else:
         raise ValueError(f"store_pt: unknown dst '{dst}'")
 
@@ -345,48 +407,104 @@ def project_to(dst):
             CUR["coord_type"] = dst
 
     Notes:
-        Camera and viewport math live ONLY here.
+        Camera and viewport math live ONLY in camera_affine(), used here
+        and by the register-free forms to_canvas() and project_bboxes().
         All math is integer; zoom is rational (num/den).
     """
     src = CUR.get("coord_type")
     if src == dst:
         return
 
-    cam_x = g["cam_x"]
-    cam_y = g["cam_y"]
+    zn, zd, kx, ky = camera_affine()
+    cur = CUR
+
+    if src == "w" and dst == "c":
+        cur["x"] = (cur["x"] * zn + kx) // zd
+        cur["y"] = (cur["y"] * zn + ky) // zd
+        cur["x0"] = (cur["x0"] * zn + kx) // zd
+        cur["y0"] = (cur["y0"] * zn + ky) // zd
+        cur["x1"] = (cur["x1"] * zn + kx) // zd
+        cur["y1"] = (cur["y1"] * zn + ky) // zd
+
+    elif src == "c" and dst == "w":
+        cur["x"] = (cur["x"] * zd - kx) // zn
+        cur["y"] = (cur["y"] * zd - ky) // zn
+        cur["x0"] = (cur["x0"] * zd - kx) // zn
+        cur["y0"] = (cur["y0"] * zd - ky) // zn
+        cur["x1"] = (cur["x1"] * zd - kx) // zn
+        cur["y1"] = (cur["y1"] * zd - ky) // zn
+
+    else:
+        raise RuntimeError(f"project_to: invalid transition {src} -> {dst}")
+
+    cur["coord_type"] = dst
+
+
+def camera_affine():
+    """
+    Return (zn, zd, kx, ky): the camera + viewport + zoom as one affine.
+
+        world -> canvas:   cx = (x * zn + kx) // zd
+        canvas -> world:   x  = (cx * zd - kx) // zn
+
+    Folding the camera offset and the view centre into kx/ky is exact:
+    ((x - cam_x) * zn) // zd + vcx  ==  (x * zn + vcx * zd - cam_x * zn) // zd.
+    """
     zn = g["zoom_num"]
     zd = g["zoom_den"]
+    return (
+        zn,
+        zd,
+        (g["canvas_view_w"] // 2) * zd - g["cam_x"] * zn,
+        (g["canvas_view_h"] // 2) * zd - g["cam_y"] * zn,
+    )
 
-    canvas = W("c")
-    vcx = g["canvas_view_w"] // 2
-    vcy = g["canvas_view_h"] // 2
 
-    def w_to_c(x, y):
-        return (
-            ((x - cam_x) * zn) // zd + vcx,
-            ((y - cam_y) * zn) // zd + vcy,
-        )
+def to_canvas(x, y):
+    """
+    Project a single world point to canvas space.
 
-    def c_to_w(x, y):
-        return (
-            ((x - vcx) * zd) // zn + cam_x,
-            ((y - vcy) * zd) // zn + cam_y,
-        )
+    Same math as project_to("c"), without going through (or disturbing)
+    the registers.
+    """
+    zn, zd, kx, ky = camera_affine()
+    return ((x * zn + kx) // zd, (y * zn + ky) // zd)
 
-    if src == "w" and dst == "c":
-        CUR["x"], CUR["y"] = w_to_c(CUR["x"], CUR["y"])
-        CUR["x0"], CUR["y0"] = w_to_c(CUR["x0"], CUR["y0"])
-        CUR["x1"], CUR["y1"] = w_to_c(CUR["x1"], CUR["y1"])
 
-    elif src == "c" and dst == "w":
-        CUR["x"], CUR["y"] = c_to_w(CUR["x"], CUR["y"])
-        CUR["x0"], CUR["y0"] = c_to_w(CUR["x0"], CUR["y0"])
-        CUR["x1"], CUR["y1"] = c_to_w(CUR["x1"], CUR["y1"])
+def to_world(cx, cy):
+    """Unproject a single canvas point to world space; the inverse of to_canvas()."""
+    zn, zd, kx, ky = camera_affine()
+    return ((cx * zd - kx) // zn, (cy * zd - ky) // zn)
 
-    else:
-        raise RuntimeError(f"project_to: invalid transition {src} -> {dst}")
 
-    CUR["coord_type"] = dst
+def project_bboxes(item_ids):
+    """
+    Batch form of load_rect("attachment") + project_to("c").
+
+    Returns:
+        dict: item_id -> (x0, y0, x1, y1) in canvas space
+
+    Notes:
+        Same integer math as project_to(), but the camera terms are read
+        once for the whole batch.  Registers are not touched.
+
+        Pans and view resizes don't come through here (apply_view()
+        translates what is drawn), so a batch is normally just the items
+        whose bbox changed.
+    """
+    attach = G_ATTACH  # local alias
+    zn, zd, kx, ky = camera_affine()
+
+    result = {}
+    for item_id in item_ids:
+        x0, y0, x1, y1 = attach[item_id]["bbox"]
+        result[item_id] = (
+            (x0 * zn + kx) // zd,
+            (y0 * zn + ky) // zd,
+            (x1 * zn + kx) // zd,
+            (y1 * zn + ky) // zd,
+        )
+    return result
 
 
 # -- Geometry Ops (Pure Spatial) -----------------------------
@@ -468,6 +586,10 @@ def pop_rect():
 
 RULES = []
 
+# rule -> guard over global state.  While a rule's guard is False the rule
+# is a no-op for every item, so sync_all() leaves it out of the pass.
+RULE_GUARDS = {}
+
 def initialize_rules_at_program_start():
     RULES.extend([
         rule_default_appearance,
@@ -475,15 +597,59 @@ def initialize_rules_at_program_start():
         rule_selected_highlight,
         rule_handles
     ])
+    RULE_GUARDS.update({
+        rule_module_highlight: lambda: g["module_highlight"] is not None,
+        rule_selected_highlight: lambda: bool(selection_set),
+    })
+
+def active_rules():
+    """RULES, minus rules whose guard says they would do nothing."""
+    guards = RULE_GUARDS
+    return [rule for rule in RULES if rule not in guards or guards[rule]()]
 
 def apply_rules():
     for rule in RULES:
         rule()
 
 def sync_all():
-    foreach_item(apply_rules)
+    g["sync_pending"] = False  # a scheduled sync is now redundant
+
+    # guards are global: decide once, not per item; the rules are then
+    # called straight from the item loop, with no apply_rules() per item
+    foreach_item(*active_rules())
     render_all()
 
+def schedule_sync_all():
+    """
+    Request sync_all() on the next idle cycle.
+
+    Any number of requests before then collapse into one sync; used by
+    handlers that Tk can fire much faster than frames are worth drawing.
+    """
+    if g["sync_pending"]:
+        return
+    g["sync_pending"] = True
+    W("r").after_idle(run_scheduled_sync)
+
+def run_scheduled_sync():
+    if g["sync_pending"]:
+        sync_all()
+
+def sync_items(item_ids):
+    """sync_all(), restricted to the given item_ids (unattached ones are skipped)."""
+    if g["sync_pending"]:
+        return  # the queued sync_all() will cover these items too
+    if not apply_view():
+        schedule_sync_all()  # every entry went geom_dirty, not only these
+        return
+    for item_id in item_ids:
+        D = G_CANVAS.get(item_id)
+        if D is None:
+            continue
+        iterate_item(item_id)
+        apply_rules()
+        render_item(item_id, D)
+
 
 # ============================================================
 # Widget Retrieval
@@ -502,11 +668,16 @@ _WIDGET_CODES = {
 def W(codes=None):
     w = widgets  # local alias
 
-    # --- Case 1: return all ---
+    # --- Case 1: single code, checked first (nearly every call) ---
+    name = _WIDGET_CODES.get(codes)
+    if name:
+        return w[name]
+
+    # --- Case 2: return all ---
     if not codes:
         return tuple(w[name] for name in _WIDGET_ORDER)
 
-    # --- Case 2 & 3: decode string ---
+    # --- Case 3: multiple, decode string ---
     if not isinstance(codes, str):
         raise TypeError("W() expects a string of widget codes, e.g. 'cp' or 'x'")
 
@@ -517,11 +688,6 @@ def W(codes=None):
             raise KeyError(f"Unknown widget code: {ch!r}")
         result.append(w[name])
 
-    # --- Case 2: single ---
-    if len(result) == 1:
-        return result[0]
-
-    # --- Case 3: multiple ---
     return tuple(result)
 
 
@@ -550,107 +716,282 @@ def keys_down(keycodes):
 # Canvas Rendering
 # ============================================================
 
+def apply_view():
+    """
+    Bring what is already drawn up to date with the camera and view size.
+
+    A change that is a pure canvas-space translation (every pan; most
+    resizes) moves all rendered objects with one canvas move, which
+    beats re-sending coords item by item once the whole scene is dirty.
+    Anything else (a zoom change, an inexact shift) marks every entry's
+    geometry dirty for the per-item path.
+
+    Returns False in that case (a render pass is still owed), else True.
+    """
+    if not g["camera_dirty"]:
+        return True
+    g["camera_dirty"] = False
+
+    view = (g["cam_x"], g["cam_y"], g["zoom_num"], g["zoom_den"],
+            g["canvas_view_w"], g["canvas_view_h"])
+    old = g["view_applied"]
+    g["view_applied"] = view
+
+    if old is not None and old[2:4] == view[2:4]:
+        zn, zd = view[2], view[3]
+        ax = (old[0] - view[0]) * zn
+        ay = (old[1] - view[1]) * zn
+        if ax % zd == 0 and ay % zd == 0:
+            # exact: the projection of every point shifts by the same amount
+            sx = ax // zd + view[4] // 2 - old[4] // 2
+            sy = ay // zd + view[5] // 2 - old[5] // 2
+            if sx or sy:
+                W("c").move("rendered", sx, sy)
+            return True
+
+    for D in G_CANVAS.values():
+        D["geom_dirty"] = True
+    return False
+
+
 def render_all():
     canvas = W("c")
 
-    orphan_candidates = set(canvas.find_withtag("rendered"))
-    
+    # Only geometry that moved on screen is re-projected and re-sent.
+    apply_view()
+    geom_ids = [item_id for item_id, D in G_CANVAS.items() if D["geom_dirty"]]
+
+    projected = project_bboxes(geom_ids)
+
+    # entries drawn for the first time (a load) get their rect and label
+    # in one Tcl call rather than two create round trips apiece
+    new = [(item_id, D) for item_id, D in G_CANVAS.items()
+           if D["rect"] is None and D["label"] is None
+           and D["rect_shouldexist"] and D["label_shouldexist"]]
+    if new:
+        create_canvas_objects(new, projected)
+
+    script = []  # coords commands, evaluated together below
     for item_id, D in G_CANVAS.items():
+        render_item(item_id, D, projected.get(item_id), script)
+
+    if script:
+        canvas.tk.eval("\n".join(script))
+
+
+# Tcl procedure body for create_canvas_objects(): creates a rect and a
+# label per group of 11 arguments and returns their ids.  Arguments
+# are passed as Tcl values, so label text needs no quoting.
+_CREATE_OBJECTS_TCL = """{c args} {
+    set ids {}
+    foreach {x0 y0 x1 y1 outline width fill lx ly text color} $args {
+        lappend ids \\
+            [$c create rectangle $x0 $y0 $x1 $y1 \\
+                -outline $outline -width $width -fill $fill -tags rendered] \\
+            [$c create text $lx $ly \\
+                -anchor w -text $text -fill $color -tags rendered]
+    }
+    return $ids
+}"""
 
-        CUR["item_id"] = item_id
-        CUR["item_canvas_data"] = D
-        
-        # ============================================================
-        # RECTANGLE
-        # ============================================================
-
-        if D["rect_shouldexist"]:
-            if D["rect"] is None:
-                D["rect"] = canvas.create_rectangle(0, 0, 0, 0,
-                                                    tags=("rendered",))
-            else:
-                # It exists, and should not be orphan discarded.
-                orphan_candidates.discard(D["rect"])
-            
-            # world -> canvas via coordinate machine
-            load_rect("attachment")
-            project_to("c")
-
-            canvas.coords(D["rect"], *get_xyxy())
-            canvas.itemconfigure(
-                D["rect"],
-                outline=D["rect_outline"],
-                width=D["rect_width"],
-                fill=D["rect_fill"],
-            )
-        else:
-            if D["rect"] is not None:
-                D["rect"] = None
+def create_canvas_objects(new, projected):
+    """
+    Create the rect and label of each (item_id, D) in new, complete and
+    in place, with one Tcl call.
 
-        # ============================================================
-        # LABEL
-        # ============================================================
+    projected maps item_id -> canvas-space bbox; the entries created
+    are taken out of it, their geometry being sent already.  Entries
+    missing from it (clean geometry) are projected here.
+    """
+    canvas = widgets["canvas"]
+    missing = [item_id for item_id, D in new if item_id not in projected]
+    if missing:
+        projected.update(project_bboxes(missing))
+
+    args = []
+    for item_id, D in new:
+        args.extend(projected.pop(item_id))
+        args.extend((D["rect_outline"], D["rect_width"], D["rect_fill"]))
+        args.extend(to_canvas(*D["label_coord"]))
+        args.extend((D["label_text"], D["label_color"]))
+
+    interp = canvas.tk
+    made = interp.splitlist(interp.call("apply", _CREATE_OBJECTS_TCL, canvas._w, *args))
+
+    for k, (item_id, D) in enumerate(new):
+        D["rect"] = rect = int(made[2 * k])
+        D["label"] = label = int(made[2 * k + 1])
+        G_CANVAS_OWNER[rect] = item_id
+        G_CANVAS_OWNER[label] = item_id
+        D["rect_style_applied"] = (D["rect_outline"], D["rect_width"], D["rect_fill"])
+        D["label_coord_applied"] = D["label_coord"]
+        D["label_style_applied"] = (D["label_text"], D["label_color"])
+        D["geom_dirty"] = False
+
+
+def release_canvas_items(*canvas_items):
+    """Delete canvas objects (one Tk call) and forget them in the reverse indexes."""
+    for canvas_item in canvas_items:
+        G_CANVAS_OWNER.pop(canvas_item, None)
+        G_HANDLE_CORNER.pop(canvas_item, None)
+    W("c").delete(*canvas_items)
+
+
+def render_item(item_id, D, rect_xyxy=None, script=None):
+    """
+    Flush one G_CANVAS entry's render intent to the Tk canvas.
+
+    rect_xyxy is the attachment bbox already projected to canvas space
+    (render_all() projects in one batch); when omitted it is projected
+    here, the same way, if the geometry needs re-sending at all.
+
+    Only what changed is sent to Tk: coords when the geometry is dirty
+    (D["geom_dirty"]) or a canvas object is new, styles when they differ
+    from the *_applied values last sent.  Camera changes must already
+    have been applied (apply_view()).
+
+    Canvas objects whose *_shouldexist intent went False are deleted
+    here, so a single item can be rendered without a render_all().
+
+    When script is a list, coords updates are appended to it as Tcl
+    commands instead of being sent; render_all() evaluates them in one
+    go.  Creation, styles and deletion are always sent immediately.
+    """
+    canvas = widgets["canvas"]  # called per item: skip the W() decode
+
+    # Updates go straight to Tcl; the coords()/itemconfigure() wrappers
+    # re-flatten and re-format their arguments on every call.
+    tkcall = canvas.tk.call
+    cw = canvas._w
+
+    geom = rect_xyxy is not None or D["geom_dirty"]
+    D["geom_dirty"] = False
+
+    creating = ((D["rect_shouldexist"] and D["rect"] is None)
+                or (D["handles_shouldexist"] and not D["handles"]))
+
+    # world -> canvas, once for rect and handles
+    if rect_xyxy is None and (geom or creating) and (
+            D["rect_shouldexist"] or D["handles_shouldexist"]):
+        rect_xyxy = project_bboxes((item_id,))[item_id]
+    
+    # ============================================================
+    # RECTANGLE
+    # ============================================================
 
-        if D["label_shouldexist"]:
-            if D["label"] is None:
-                D["label"] = canvas.create_text(0, 0, anchor="w",
-                                                tags=("rendered",))
+    if D["rect_shouldexist"]:
+        rect = D["rect"]
+        style = outline, width, fill = (
+            D["rect_outline"], D["rect_width"], D["rect_fill"])
+
+        if rect is None:
+            # created complete: one Tk call instead of create + coords + config
+            D["rect"] = rect = canvas.create_rectangle(
+                *rect_xyxy,
+                outline=outline,
+                width=width,
+                fill=fill,
+                tags=("rendered",),
+            )
+            G_CANVAS_OWNER[rect] = item_id
+            D["rect_style_applied"] = style
+
+        elif rect_xyxy is not None:
+            if script is None:
+                tkcall(cw, "coords", rect, *rect_xyxy)
             else:
-                # It exists, and should not be orphan discarded.
-                orphan_candidates.discard(D["label"])
-            
-            # world -> canvas via coordinate machine
-            load_pt("label")
-            project_to("c")
-
-            canvas.coords(D["label"], *get_xy())
-            canvas.itemconfigure(
-                D["label"],
-                text=D["label_text"],
-                fill=D["label_color"],
+                script.append("%s coords %s %s %s %s %s" % (cw, rect, *rect_xyxy))
+
+        if style != D["rect_style_applied"]:
+            tkcall(
+                cw, "itemconfigure", rect,
+                "-outline", outline,
+                "-width", width,
+                "-fill", fill,
             )
-        else:
-            if D["label"] is not None:
-                D["label"] = None
-
-        # ============================================================
-        # HANDLES
-        # ============================================================
-
-        if D["handles_shouldexist"]:
-            tags = ["nw", "ne", "se", "sw"]
-            
-            if not D["handles"]:
-                # create 4 handles
-                handles = []
-                for tag in tags:
-                    h = canvas.create_rectangle(
-                        0, 0, 0, 0,
-                        fill="#ffcc00", outline="#000000",
-                        tags=("handle", tag, "rendered")
-                    )
-                    handles.append(h)
-                D["handles"] = handles
+            D["rect_style_applied"] = style
+    else:
+        if D["rect"] is not None:
+            release_canvas_items(D["rect"])
+            D["rect"] = None
+
+    # ============================================================
+    # LABEL
+    # ============================================================
+
+    if D["label_shouldexist"]:
+        label = D["label"]
+        coord = D["label_coord"]
+        style = text, color = (D["label_text"], D["label_color"])
+
+        if label is None:
+            D["label"] = label = canvas.create_text(
+                *to_canvas(*coord),
+                anchor="w",
+                text=text,
+                fill=color,
+                tags=("rendered",),
+            )
+            G_CANVAS_OWNER[label] = item_id
+            D["label_coord_applied"] = coord
+            D["label_style_applied"] = style
+        
+        elif geom or coord != D["label_coord_applied"]:
+            if script is None:
+                tkcall(cw, "coords", label, *to_canvas(*coord))
             else:
-                for h in D["handles"]:
-                    orphan_candidates.discard(h)
-            
-            # corners derivced from world rect -> projected per-handle
-            load_rect("attachment")
-            project_to("c")
-            x0,y0, x1, y1 = get_xyxy()
-            corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]  # canvas-coordinates!
+                script.append("%s coords %s %s %s" % (cw, label, *to_canvas(*coord)))
+            D["label_coord_applied"] = coord
+
+        if style != D["label_style_applied"]:
+            tkcall(
+                cw, "itemconfigure", label,
+                "-text", text,
+                "-fill", color,
+            )
+            D["label_style_applied"] = style
+    else:
+        if D["label"] is not None:
+            release_canvas_items(D["label"])
+            D["label"] = None
 
-            for h, (x, y) in zip(D["handles"], corners):
-                canvas.coords(h, x - 5, y - 5, x + 5, y + 5)
+    # ============================================================
+    # HANDLES
+    # ============================================================
 
+    if D["handles_shouldexist"] and rect_xyxy is not None:
+        tags = ["nw", "ne", "se", "sw"]
+        
+        # corners derived from the projected rect
+        x0, y0, x1, y1 = rect_xyxy
+        corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]  # canvas-coordinates!
+
+        if not D["handles"]:
+            # create 4 handles, already in place, in one Tcl evaluation
+            # (a selection change otherwise costs four create round trips)
+            interp = canvas.tk
+            made = interp.eval("list " + " ".join(
+                "[%s create rectangle %s %s %s %s"
+                " -fill #ffcc00 -outline #000000 -tags {handle %s rendered}]"
+                % (cw, x - 5, y - 5, x + 5, y + 5, tag)
+                for tag, (x, y) in zip(tags, corners)))
+            handles = [int(h) for h in interp.splitlist(made)]
+            for h, tag in zip(handles, tags):
+                G_CANVAS_OWNER[h] = item_id
+                G_HANDLE_CORNER[h] = tag
+            D["handles"] = handles
+        elif script is None:
+            for h, (x, y) in zip(D["handles"], corners):
+                tkcall(cw, "coords", h, x - 5, y - 5, x + 5, y + 5)
         else:
-            if D["handles"]:
-                del D["handles"][:]
+            for h, (x, y) in zip(D["handles"], corners):
+                script.append("%s coords %s %s %s %s %s"
+                              % (cw, h, x - 5, y - 5, x + 5, y + 5))
 
-    # delete orphans
-    for canvas_item in orphan_candidates:
-        canvas.delete(canvas_item)
+    elif not D["handles_shouldexist"]:
+        if D["handles"]:
+            release_canvas_items(*D["handles"])
+            del D["handles"][:]
 
 
 # ============================================================
@@ -660,30 +1001,38 @@ def render_all():
 def build_module_index():
     """
     Returns:
-      dict: module_name -> [item_id, ...]
+      (index, ungrouped), in one pass over the inventory:
+        index:      dict: module_name -> [item_id, ...]
+        ungrouped:  [item_id, ...] of items with no module
+      (item_ids in sorted order)
     """
-    index = defaultdict(list)
+    index = {}
+    ungrouped = []
 
-    for item_id, item in G_INV.items():
-        modules = item.get("modules") or []
+    for item_id in G_INV_KEYS:
+        modules = G_INV[item_id].get("modules")
+        if not modules:
+            ungrouped.append(item_id)
+            continue
         for m in modules:
-            index[m].append(item_id)
+            index.setdefault(m, []).append(item_id)
 
-    return dict(index)
+    return index, ungrouped
 
 def items_in_module(module):
-    result = []
-    for item_id, item in G_INV.items():
-        if module in (item.get("modules") or []):
-            result.append(item_id)
-    return result
+    return G_MODULE_INDEX.get(module, [])
 
 def set_module_highlight(module):
-    if module == g["module_highlight"]:
+    prev = g["module_highlight"]
+    if module == prev:
         return
 
     g["module_highlight"] = module
-    sync_all()
+
+    # only members of the old and the new module change appearance
+    changed = set(items_in_module(prev))
+    changed.update(items_in_module(module))
+    sync_items(changed)
 
 
 # ============================================================
@@ -691,64 +1040,208 @@ def set_module_highlight(module):
 # ============================================================
 
 def apply_drag(dx, dy):
+    if not G_DRAG["handle"]:
+        drag_move(dx, dy)
+        return
+
+    c = G_DRAG["corner"]
     for item_id in list(selection_set):
         iterate_item(item_id)
         
         load_rect("attachment")
-        
-        if G_DRAG["handle"]:
-            c = G_DRAG["corner"]
-            load_pt(c)
-            slide_pt(dx,dy)
-            store_pt(c)
-        else:
-            slide_rect(dx,dy)
-        
+        load_pt(c)
+        slide_pt(dx,dy)
+        store_pt(c)
         store_rect("attachment")
 
 
+def drag_move(dx, dy):
+    """
+    apply_drag() for a plain move: slide_rect on every selected bbox.
+
+    Same effect as load_rect / slide_rect / store_rect per item (bbox
+    updated, geom_dirty set), minus the register round trip; this runs
+    on every flushed motion of an ordinary drag.
+    """
+    attach_get = G_ATTACH.get
+    canvas_get = G_CANVAS.get
+    for item_id in selection_set:
+        A = attach_get(item_id)
+        if A is None:
+            continue  # selected in the tree, not attached
+        x0, y0, x1, y1 = A["bbox"]
+        A["bbox"] = (x0 + dx, y0 + dy, x1 + dx, y1 + dy)
+        D = canvas_get(item_id)
+        if D is not None:
+            D["geom_dirty"] = True
+
+
+# ============================================================
+# SPATIAL INDEX (World-Space Grid Buckets)
+# ============================================================
+#
+# G_GRID maps (col, row) -> set of item_ids whose world bbox touches
+# that cell.  G_GRID_CELLS maps item_id -> (rank, cells) so an item can
+# be re-filed without scanning the grid; rank follows creation order,
+# so the highest rank is the topmost rectangle on the canvas.
+#
+# A bbox need not be normalized: a handle drag can pull one corner past
+# the opposite one, and Tk draws the rect regardless.  Every test here
+# takes min/max per axis.
+#
+# Indexed:   attach_new_square(), load_attachments(), end of a drag
+# Unindexed: delete_attachment()
+# Queried:   canvas_item_at(), the hit test for canvas events
+#
+
+GRID_CELL = 128  # world units per grid cell
+
+G_GRID = {}
+G_GRID_CELLS = {}
+
+def grid_cells(x0, y0, x1, y1):
+    c0, c1 = sorted((int(x0) // GRID_CELL, int(x1) // GRID_CELL))
+    r0, r1 = sorted((int(y0) // GRID_CELL, int(y1) // GRID_CELL))
+    return [(c, r) for c in range(c0, c1 + 1) for r in range(r0, r1 + 1)]
+
+def grid_remove(item_id):
+    rank, cells = G_GRID_CELLS.pop(item_id, (None, ()))
+    for cell in cells:
+        bucket = G_GRID[cell]
+        bucket.discard(item_id)
+        if not bucket:
+            del G_GRID[cell]
+    return rank
+
+def grid_insert(item_id):
+    """(Re-)file item_id under the cells covered by its attachment bbox."""
+    rank = grid_remove(item_id)
+    if rank is None:
+        rank = g["grid_rank"]
+        g["grid_rank"] += 1
+
+    cells = grid_cells(*G_ATTACH[item_id]["bbox"])
+    for cell in cells:
+        G_GRID.setdefault(cell, set()).add(item_id)
+    G_GRID_CELLS[item_id] = (rank, cells)
+
+def query_bbox(x0, y0, x1, y1):
+    """Return the set of item_ids whose world bbox overlaps the world rect."""
+    x0, x1 = sorted((x0, x1))
+    y0, y1 = sorted((y0, y1))
+    found = set()
+    for cell in grid_cells(x0, y0, x1, y1):
+        for item_id in G_GRID.get(cell, ()):
+            bx0, by0, bx1, by1 = G_ATTACH[item_id]["bbox"]
+            if (min(bx0, bx1) <= x1 and max(bx0, bx1) >= x0
+                    and min(by0, by1) <= y1 and max(by0, by1) >= y0):
+                found.add(item_id)
+    return found
+
+def pick(x, y):
+    """Return the topmost item_id whose world bbox contains (x, y), or None."""
+    bucket = G_GRID.get((int(x) // GRID_CELL, int(y) // GRID_CELL), ())
+    best = None
+    best_rank = -1
+    for item_id in bucket:
+        bx0, by0, bx1, by1 = G_ATTACH[item_id]["bbox"]
+        if (min(bx0, bx1) <= x <= max(bx0, bx1)
+                and min(by0, by1) <= y <= max(by0, by1)):
+            rank = G_GRID_CELLS[item_id][0]
+            if rank > best_rank:
+                best, best_rank = item_id, rank
+    return best
+
+
+# ============================================================
+# JSON FILES
+# ============================================================
+#
+# orjson when installed (the "fast" extra), else stdlib json.  Files are
+# read and written as bytes: both libraries handle UTF-8 bytes directly.
+
+def read_json(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def write_json(path, data):
+    """
+    Serialize in full, then write once to a temp file and swap it in,
+    so a failed save never leaves a half-written file at path.
+
+    Returns False, leaving the file alone, if it already holds exactly
+    these bytes (compared against the file itself, so edits made outside
+    the app are never mistaken for a saved state); True once written.
+    """
+    if orjson is not None:
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        raw = json.dumps(data, indent=2).encode("utf-8")
+
+    try:
+        with open(path, "rb") as f:
+            if f.read() == raw:
+                return False
+    except FileNotFoundError:
+        pass
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())  # on disk before it replaces the old file
+    os.replace(tmp, path)
+    return True
+
+
 # ============================================================
 # INVENTORY
 # ============================================================
 
 def load_inventory(path="inventory.json"):
-    global G_INV
+    global G_INV, G_INV_KEYS, G_MODULE_INDEX, G_UNGROUPED
 
-    with open(path, "r", encoding="utf-8") as f:
-        items = json.load(f)
+    items = read_json(path)
 
     G_INV = {item["id"]: item for item in items}
+    G_INV_KEYS = sorted(G_INV)
+    G_MODULE_INDEX, G_UNGROUPED = build_module_index()
 
 
 # ============================================================
 # CANVAS HELPERS
 # ============================================================
 
-def is_handle(item_id):
-    return "handle" in widgets["canvas"].gettags(item_id)
+def canvas_items_of(D):
+    """Return the live canvas object ids of one G_CANVAS entry."""
+    ids = [i for i in (D["rect"], D["label"]) if i is not None]
+    ids.extend(D["handles"])
+    return ids
 
 
-def corner_for_handle(item_id):
+def bulk_move(canvas_items, dx, dy):
+    """Move canvas objects by (dx, dy) with a single Tcl evaluation."""
+    if not canvas_items:
+        return
     canvas = W("c")
-    tags = canvas.gettags(item_id)
+    cw = canvas._w
+    canvas.tk.eval("\n".join(f"{cw} move {i} {dx} {dy}" for i in canvas_items))
+
 
-    for t in ("nw", "ne", "se", "sw"):
-        if t in tags:
-            return t
+def is_handle(item_id):
+    return item_id in G_HANDLE_CORNER
 
-    return None
 
+def corner_for_handle(item_id):
+    return G_HANDLE_CORNER.get(item_id)
 
-def item_id_for_canvas_item(canvas_item):
-    for item_id, data in G_CANVAS.items():
-        if canvas_item in (
-            data.get("rect"),
-            data.get("label"),
-            *data.get("handles", []),
-        ):
-            return item_id
 
-    return None
+def item_id_for_canvas_item(canvas_item):
+    return G_CANVAS_OWNER.get(canvas_item)
 
 
 def cursor_for_item(canvas_item):
@@ -758,6 +1251,14 @@ def cursor_for_item(canvas_item):
     return "sizing" if is_handle(canvas_item) else "fleur"
 
 
+def set_canvas_cursor(cursor):
+    """Configure the canvas cursor, skipping the Tk call if unchanged."""
+    if cursor == g["canvas_cursor"]:
+        return
+    g["canvas_cursor"] = cursor
+    W("c").config(cursor=cursor)
+
+
 # ============================================================
 # HANDLE MANAGEMENT
 # ============================================================
@@ -770,8 +1271,44 @@ def rule_handles():
 # ATTACHMENT LIFECYCLE
 # ============================================================
 
+def new_canvas_entry(item_id):
+    """
+    Return a fresh G_CANVAS entry for an attached item.
+
+    Every entry is built here, so all entries share one key layout.
+    Render intent starts at its defaults; the rules refine it on the
+    next sync.
+    """
+    x0, y0, x1, y1 = G_ATTACH[item_id]["bbox"]
+
+    return {
+        # canvas identities
+        "rect": None,
+        "label": None,
+        "handles": [],
+
+        # render intent
+        "rect_shouldexist": True,
+        "label_shouldexist": True,
+        "handles_shouldexist": False,
+        
+        "rect_outline": "white",
+        "rect_width": 1,
+        "rect_fill": G_ATTACH[item_id]["color"],
+
+        "label_coord": (x0 + 5, y1 + 10),
+        "label_text": G_INV[item_id]["symbol"],
+        "label_color": "white",
+
+        # render bookkeeping (renderer only)
+        "geom_dirty": True,
+        "rect_style_applied": None,
+        "label_coord_applied": None,
+        "label_style_applied": None,
+    }
+
+
 def attach_new_square():
-    canvas = W("c")
     size = 40
 
     item_id = only_selected()
@@ -788,38 +1325,16 @@ def attach_new_square():
         "bbox": (x0, y0, x1, y1),
         "color": "#88ccff",
     }
+    grid_insert(item_id)
 
     # ---- projected render intent ----
-    load_pt("sw")
-    slide_pt(5,10)
-    label_x, label_y = get_xy()
-
-    G_CANVAS[item_id] = {
-        # canvas identities
-        "rect": None,
-        "label": None,
-        "handles": [],
-
-        # render intent (screen space)
-        "rect_shouldexist": True,
-        "label_shouldexist": True,
-        "handles_shouldexist": False,
-        
-        "rect_coords": (x0, y0, x1, y1),
-        "rect_outline": "white",
-        "rect_width": 1,
-        "rect_fill": "#88ccff",
-
-        "label_coord": (label_x, label_y),
-        "label_text": G_INV[item_id]["symbol"],
-        "label_color": "white",
-    }
+    G_CANVAS[item_id] = new_canvas_entry(item_id)
 
-    sync_all()
+    sync_items((item_id,))  # no other item's intent depends on this one
 
 
 def delete_attachment():
-    item_id = g["item_id"]
+    item_id = CUR["item_id"]
     
     # de-select
     if is_selected():
@@ -828,8 +1343,32 @@ def delete_attachment():
     if item_id == G_DRAG["item_id"]:
         cancel_drag()
     
+    release_canvas_items(*canvas_items_of(G_CANVAS[item_id]))
+
     del G_CANVAS[item_id]
     del G_ATTACH[item_id]
+    grid_remove(item_id)
+
+
+def clear_attachments():
+    """
+    Drop every attachment at once.
+
+    Same end state as delete_attachment() on each item, but with one
+    canvas delete and no per-item re-sync.
+    """
+    selection_set.difference_update(G_ATTACH)
+
+    if G_DRAG["item_id"] in G_ATTACH:
+        cancel_drag()
+
+    W("c").delete("rendered")
+    G_CANVAS.clear()
+    G_CANVAS_OWNER.clear()
+    G_HANDLE_CORNER.clear()
+    G_ATTACH.clear()
+    G_GRID.clear()
+    G_GRID_CELLS.clear()
 
 
 # ============================================================
@@ -845,26 +1384,50 @@ def is_only_selected():
 def only_selected():
     return next(iter(selection_set)) if len(selection_set) == 1 else None
 
+def sync_selection(prev):
+    """
+    Re-sync only the items whose selection styling may have changed.
+
+    prev is the selection_set as it was before the change.  Items that
+    entered or left the selection change appearance; so does a sole
+    selected item, which gains or loses its handles (rule_handles).
+    """
+    changed = prev ^ selection_set
+    if len(prev) == 1:
+        changed |= prev
+    if len(selection_set) == 1:
+        changed |= selection_set
+    sync_items(changed)
+
 def toggle_selected():
+    prev = set(selection_set)
     item_id = CUR["item_id"]
     if item_id in selection_set:
         selection_set.remove(item_id)
     else:
         selection_set.add(item_id)
-    sync_all()
+    sync_selection(prev)
 
 def clear_selection():
+    if not selection_set:
+        return
+    prev = set(selection_set)
     selection_set.clear()
-    sync_all()
+    sync_selection(prev)
     sync_tree_selection()
     sync_json_view()
 
 def set_selected():
     """invariant: set_selected, clear_selection, and toggle_selected are the only places selection can change"""
+    item_id = CUR["item_id"]
+    if selection_set == {item_id} and g["module_highlight"] is None:
+        return  # already the sole selection; nothing to re-sync
+
+    prev = set(selection_set)
     selection_set.clear()
-    selection_set.add(CUR["item_id"])
-    g["module_highlight"] = None
-    sync_all()
+    selection_set.add(item_id)
+    set_module_highlight(None)
+    sync_selection(prev)
     sync_tree_selection()
     sync_json_view()
 
@@ -873,31 +1436,8 @@ def rule_default_appearance():
     x0, y0, x1, y1 = attach["bbox"]
 
     D = CUR["item_canvas_data"]
-    rect_id = D["rect"]
-    label_id = D["label"]
-
-    # project rect
-    D["rect_coords"] = (x0,y0,x1,y1)
-    D["rect_outline"] = "white"
-    D["rect_width"] = 1
-
-    # project label (centered under rect)
-    if label_id is not None:
-        label_x = x0 + 5
-        label_y = y1 + 10
-        D["label_coord"] = (label_x, label_y)
-        D["label_color"] = "white"
-
-def rule_default_appearance():
-    attach = CUR["item_attachment_data"]
-    x0, y0, x1, y1 = attach["bbox"]
-
-    D = CUR["item_canvas_data"]
-    rect_id = D["rect"]
-    label_id = D["label"]
 
     # ---- render intent ----
-    D["rect_coords"] = (x0, y0, x1, y1)
     D["rect_outline"] = "white"
     D["rect_width"] = 1
     D["rect_fill"] = "#88ccff"
@@ -905,14 +1445,13 @@ def rule_default_appearance():
     cx = x0 + 5
     cy = y1 + 10
     D["label_coord"] = (cx, cy)
-    D["label_text"] = G_INV[CUR["item_id"]]["symbol"]
+    D["label_text"] = CUR["item_inv"]["symbol"]
     D["label_color"] = "white"
 
 
 def rule_selected_highlight():
     if is_selected():
         D = CUR["item_canvas_data"]
-        rect = D["rect"]
         D["rect_outline"] = "yellow"
         D["rect_width"] = 3
 
@@ -929,8 +1468,25 @@ def sync_tree_selection():
         tree.see(sel)
 
 def sync_json_view():
-    text = W("x")
+    """
+    Schedule a text pane refresh.
+
+    Renders are deferred 40ms and each call replaces the pending one, so
+    arrow-keying through the tree renders only where the user stops.
+    """
+    root = W("r")
+    if g["json_view_after"] is not None:
+        root.after_cancel(g["json_view_after"])
+    g["json_view_after"] = root.after(40, render_json_view)
+
+def render_json_view():
+    g["json_view_after"] = None
     item_id = only_selected()
+    if item_id == g["json_view_item"]:
+        return  # e.g. re-selecting the shown item after a drag
+
+    g["json_view_item"] = item_id
+    text = W("x")
 
     if not item_id:
         text.delete("1.0", "end")
@@ -945,7 +1501,6 @@ def sync_json_view():
 
 def rule_module_highlight():
     D = CUR["item_canvas_data"]
-    rect = D["rect"]
     highlight = g["module_highlight"]
 
     if highlight and highlight in CUR["item_modules"]:
@@ -958,10 +1513,42 @@ def rule_module_highlight():
 # ============================================================
 
 def canvas_top():
-    """helper: Return the first canvas item labelled 'current'."""
-    items = widgets["canvas"].find_withtag("current")
+    """
+    helper: Return the canvas item under the pointer for CUR["event"].
+
+    Canvas events are answered from memory first (canvas_item_at());
+    Tk's 'current' item is the fallback, for what is not indexed
+    (labels) and for events from other widgets.
+    """
+    canvas = widgets["canvas"]
+    event = CUR["event"]
+    if event.widget is canvas:
+        top = canvas_item_at(event.x, event.y)
+        if top is not None:
+            return top
+
+    items = canvas.find_withtag("current")
     return items[0] if items else None
 
+def canvas_item_at(cx, cy):
+    """
+    Return the canvas item at canvas point (cx, cy) without asking Tk:
+    a handle of the sole selected item, else the rect of the topmost
+    attachment there (pick()).  None if neither is hit.
+    """
+    item_id = only_selected()
+    D = G_CANVAS.get(item_id) if item_id else None
+    if D and D["handles"]:
+        # handles sit above their rect, 10x10 around each corner
+        x0, y0, x1, y1 = project_bboxes((item_id,))[item_id]
+        for h, (x, y) in zip(D["handles"], ((x0, y0), (x1, y0), (x1, y1), (x0, y1))):
+            if abs(cx - x) <= 5 and abs(cy - y) <= 5:
+                return h
+
+    item_id = pick(*to_world(cx, cy))
+    D = G_CANVAS.get(item_id) if item_id else None
+    return D["rect"] if D else None
+
 def on_tree_select():
     tree = W("t")
     sel = tree.selection()
@@ -983,24 +1570,28 @@ def on_tree_select():
 
 
 def on_delete_key():
-    for item_id in set(selection_set):
-        iterate_item(item_id)
-        delete_attachment()
+    doomed = set(selection_set)
+    if not doomed:
+        return
+
+    # one deselect (and one tree / text pane refresh) for the whole batch,
+    # instead of a toggle_selected() re-sync per deleted item
+    clear_selection()
+
+    for item_id in doomed:
+        if item_id in G_ATTACH:  # tree selections may be unattached
+            iterate_item(item_id)
+            delete_attachment()
 
 
 def on_canvas_hover():
-    item = CUR["top"]
-    
-    if item == g["hover_canvas_item"]:
-        return
-    
-    g["hover_canvas_item"] = item
-    widgets["canvas"].config(cursor=cursor_for_item(item))
+    # set_canvas_cursor() drops the Tk call when the cursor kind is the
+    # same, so no separate "hovered item changed" check is needed
+    set_canvas_cursor(cursor_for_item(CUR["top"]))
 
 
 def on_canvas_mouse_leaves():
-    g["hover_canvas_item"] = None
-    widgets["canvas"].config(cursor="")
+    set_canvas_cursor("")
 
 
 def clear_drag():
@@ -1010,6 +1601,12 @@ def clear_drag():
     G_DRAG["handle"] = None
     G_DRAG["corner"] = None
     G_DRAG["mode"] = None
+    G_DRAG["dx"] = 0
+    G_DRAG["dy"] = 0
+    G_DRAG["flush_pending"] = False
+    G_DRAG["moved"] = False
+    G_DRAG["pan_rem_x"] = 0
+    G_DRAG["pan_rem_y"] = 0
     
 def start_drag(mode):
     """
@@ -1050,7 +1647,7 @@ def cancel_drag():
 
 def on_canvas_button_press():
     selected_item_id = only_selected()  # None if 0 or >1 items selected
-    if not CUR["top"] and selected_item_id and selected_item_id not in G_CANVAS:
+    if not CUR["top_item_id"] and selected_item_id and selected_item_id not in G_CANVAS:
         attach_new_square()
     else:
         start_drag("item" if CUR["top_item_id"] else "pan")
@@ -1061,42 +1658,99 @@ def on_canvas_motion():
         dx = event.x - G_DRAG["x"]
         dy = event.y - G_DRAG["y"]
 
-        # move camera opposite to mouse motion
-        g["cam_x"] -= dx * g["zoom_den"] // g["zoom_num"]
-        g["cam_y"] -= dy * g["zoom_den"] // g["zoom_num"]
+        # move camera opposite to mouse motion; one divmod per axis, and
+        # the remainder carries over so slow pans don't drift when zoomed
+        zn = g["zoom_num"]
+        zd = g["zoom_den"]
+        step_x, G_DRAG["pan_rem_x"] = divmod(dx * zd + G_DRAG["pan_rem_x"], zn)
+        step_y, G_DRAG["pan_rem_y"] = divmod(dy * zd + G_DRAG["pan_rem_y"], zn)
+        g["cam_x"] -= step_x
+        g["cam_y"] -= step_y
+        g["camera_dirty"] = True
 
         G_DRAG["x"], G_DRAG["y"] = event.x, event.y
-        sync_all()
+
+        # flush_drag() brings the view up to date once per idle cycle
+        if not G_DRAG["flush_pending"]:
+            G_DRAG["flush_pending"] = True
+            W("r").after_idle(flush_drag)
         
     elif G_DRAG["mode"] == "item":
         item_id = G_DRAG["item_id"]
-        iterate_item(item_id)
 
         if not item_id or item_id not in G_CANVAS:
             cancel_drag()
             return
 
-        dx = event.x - G_DRAG["x"]
-        dy = event.y - G_DRAG["y"]
+        # accumulate; flush_drag() applies once per idle cycle
+        G_DRAG["dx"] += event.x - G_DRAG["x"]
+        G_DRAG["dy"] += event.y - G_DRAG["y"]
+        G_DRAG["x"], G_DRAG["y"] = event.x, event.y
 
-        apply_drag(dx, dy)
-        sync_all()
+        if not G_DRAG["flush_pending"]:
+            G_DRAG["flush_pending"] = True
+            W("r").after_idle(flush_drag)
 
-        G_DRAG["x"], G_DRAG["y"] = event.x, event.y
+
+def flush_drag():
+    """Apply the drag motion accumulated since the last flush."""
+    G_DRAG["flush_pending"] = False
+
+    if G_DRAG["mode"] == "pan":
+        # the camera feeds no rule: a pan is one canvas move, and only
+        # an inexact shift falls back to a (coalesced) full sync
+        if not apply_view():
+            schedule_sync_all()
+        return
+
+    dx, dy = G_DRAG["dx"], G_DRAG["dy"]
+
+    if G_DRAG["mode"] != "item" or not (dx or dy):
+        return
+
+    G_DRAG["dx"] = 0
+    G_DRAG["dy"] = 0
+    apply_drag(dx, dy)
+    G_DRAG["moved"] = True
+
+    if G_DRAG["handle"]:
+        # resize changes shape; re-run rules and render, but only for
+        # the resized item(s): nothing else depends on their geometry
+        sync_items(selection_set)
+    else:
+        # pure translation: shift what is already drawn, in one Tcl
+        # script; button release re-syncs the dragged items
+        ids = []
+        for item_id in selection_set:
+            D = G_CANVAS.get(item_id)
+            if D:
+                ids.extend(canvas_items_of(D))
+        bulk_move(ids, dx, dy)
 
 
 def on_canvas_button_release():
+    flush_drag()
+    if G_DRAG["mode"] == "item":
+        if G_DRAG["moved"]:
+            for item_id in selection_set:
+                if item_id in G_ATTACH:  # tree selections may be unattached
+                    grid_insert(item_id)
+        sync_items(selection_set)
     cancel_drag()
-    g["hover_canvas_item"] = None
-    widgets["canvas"].config(cursor="")
+    set_canvas_cursor("")
 
 
 def on_canvas_configure():
     # We have to do this, because Tk is weirdly forgetful.
     event = CUR["event"]
+    if (event.width, event.height) == (g["canvas_view_w"], g["canvas_view_h"]):
+        return  # <Configure> also fires for moves and border changes
+
     g["canvas_view_w"] = event.width
     g["canvas_view_h"] = event.height
-    sync_all()
+    g["camera_dirty"] = True
+    if not apply_view():  # as for a pan
+        schedule_sync_all()  # interactive resizes deliver bursts of these
 
 
 # ============================================================
@@ -1115,34 +1769,27 @@ def set_window_geometry(geom):
 
 
 def save_attachments(path="attachments.json"):
-    data = {}
-
-    for item_id, meta in G_ATTACH.items():
-        data[item_id] = {
-            "bbox": list(meta["bbox"]),
-            "color": meta.get("color", "#88ccff"),
-        }
+    data = {
+        item_id: {"bbox": meta["bbox"], "color": meta.get("color", "#88ccff")}
+        for item_id, meta in G_ATTACH.items()
+    }
 
     data["_layout"] = get_pane_layout()
     data["_window"] = get_window_geometry()
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-
-    print(f"[saved] {path}")
+    if write_json(path, data):
+        print(f"[saved] {path}")
+    else:
+        print(f"[unchanged] {path}")
 
 
 def load_attachments(path="attachments.json"):
     if not os.path.exists(path):
         return
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = read_json(path)
 
-    # Clear existing attachments
-    for item_id in list(G_CANVAS.keys()):
-        iterate_item(item_id)
-        delete_attachment()
+    clear_attachments()
 
     layout = data.pop("_layout", None)
     window_geom = data.pop("_window", None)
@@ -1160,31 +1807,10 @@ def load_attachments(path="attachments.json"):
             "bbox": (x0, y0, x1, y1),
             "color": color,
         }
+        grid_insert(item_id)
 
         # ---- projected render intent ----
-        cx = (x0 + x1) / 2
-        cy = y1 + 10
-
-        G_CANVAS[item_id] = {
-            # canvas IDs
-            "rect": None,
-            "label": None,
-            "handles": [],
-            
-            # render intent
-            "rect_shouldexist": True,
-            "label_shouldexist": True,
-            "handles_shouldexist": False,
-            
-            "rect_coords": (x0, y0, x1, y1),
-            "rect_outline": "white",
-            "rect_width": 1,
-            "rect_fill": color,
-
-            "label_coord": (cx, cy),
-            "label_text": G_INV[item_id]["symbol"],
-            "label_color": "white",
-        }
+        G_CANVAS[item_id] = new_canvas_entry(item_id)
 
     print(f"[loaded] {path}")
     
@@ -1221,83 +1847,104 @@ def focus_canvas():
 
 def get_pane_layout():
     panes = W("p")
-    layout = {
-        "visible": dict(G_PANES),
-        "sashes": [],
-    }
+    sash_coord = panes.sash_coord
+    n_sashes = sum(G_PANES.values()) - 1  # G_PANES mirrors the managed panes
 
-    for i in range(panes.panes().__len__() - 1):
-        x, y = panes.sash_coord(i)
-        layout["sashes"].append((x, y))
-
-    return layout
+    return {
+        "visible": G_PANES,  # encoded right away by the save; no copy needed
+        "sashes": [tuple(sash_coord(i)) for i in range(n_sashes)],
+    }
 
 def set_pane_layout(layout):
     tree, canvas, text, panes, root = W()
+    visible = layout["visible"]
+    sashes = layout.get("sashes", [])
+    changed = False
+
     # Restore visibility
     for widget in (tree, canvas, text):
         name = widget._pane_name
-        should_be_visible = layout["visible"].get(name, True)
+        should_be_visible = visible.get(name, True)
 
         if should_be_visible and not G_PANES[name]:
             panes.add(widget)
             G_PANES[name] = True
+            changed = True
         elif not should_be_visible and G_PANES[name]:
             panes.forget(widget)
             G_PANES[name] = False
+            changed = True
+
+    if not (changed or sashes):
+        return  # nothing to lay out; skip the forced idle pass
 
     root.update_idletasks()
 
     # Restore sashes
-    for i, (x, y) in enumerate(layout.get("sashes", [])):
+    sash_place = panes.sash_place
+    for i, (x, y) in enumerate(sashes):
         try:
-            panes.sash_place(i, x, y)
+            sash_place(i, x, y)
         except Exception:
             pass
 
-def insert_line(text_widget, content, tag=None):
-    start = text_widget.index("end-1c")
-    text_widget.insert("end", content + "\n")
-    if tag:
-        end = text_widget.index("end-1c")
-        text_widget.tag_add(tag, start, end)
+# Text pane content is assembled in a buffer first, then written with
+# a single multi-segment insert (see flush_text_buf), instead of an
+# insert + index() + tag_add round-trip for every line.  Tk applies the
+# tags itself, so no character offsets are computed in Python.
+#
+#   buf = [str, (tag, ...), str, (tag, ...), ...]
 
+def new_text_buf():
+    return []
 
-def insert_kv(text_widget, label, value, label_tag="label", value_tag="value"):
-    start = text_widget.index("end-1c")
-    text_widget.insert("end", f"{label:<9} ")
-    mid = text_widget.index("end-1c")
-    text_widget.insert("end", f"{value}\n")
 
-    text_widget.tag_add(label_tag, start, mid)
-    text_widget.tag_add(value_tag, mid, text_widget.index("end-1c"))
+def _buf_append(buf, content, tag=None):
+    buf.append(content)
+    buf.append((tag,) if tag else ())
 
-def render_inventory_item(text_widget, item):
+
+def insert_line(buf, content, tag=None):
+    _buf_append(buf, content + "\n", tag)
+
+
+def insert_kv(buf, label, value, label_tag="label", value_tag="value"):
+    _buf_append(buf, f"{label:<9} ", label_tag)
+    _buf_append(buf, f"{value}\n", value_tag)
+
+
+def flush_text_buf(text_widget, buf):
+    """Replace text_widget's contents with the buffered, tagged text."""
     text_widget.delete("1.0", "end")
+    if buf:
+        text_widget.insert("end", *buf)
+
+def render_inventory_item(text_widget, item):
+    buf = new_text_buf()
 
     # --- Title ---
     name = item.get("symbol", "<unnamed>")
     kind = item.get("symbol_type", "")
     title = f"{name} ({kind})" if kind else name
-    insert_line(text_widget, title, "title")
-    insert_line(text_widget, "─" * 40, "subtitle")
-    insert_line(text_widget, "")
+    insert_line(buf, title, "title")
+    insert_line(buf, "─" * 40, "subtitle")
+    insert_line(buf, "")
 
     # --- Source ---
     src = item.get("source_file")
     ln = item.get("line_number")
     if src:
         if ln:
-            insert_line(text_widget, f"src: {src}  (ln {ln})", "subtitle")
+            insert_line(buf, f"src: {src}  (ln {ln})", "subtitle")
         else:
-            insert_line(text_widget, f"src: {src}", "subtitle")
+            insert_line(buf, f"src: {src}", "subtitle")
 
     raw = item.get("raw")
     if raw:
-        insert_line(text_widget, f"  {raw}", "comment")
+        insert_line(buf, f"  {raw}", "comment")
 
     if src or raw:
-        insert_line(text_widget, "")
+        insert_line(buf, "")
 
     # --- Structured fields ---
     def emit(label, value):
@@ -1305,7 +1952,7 @@ def render_inventory_item(text_widget, item):
             return
         if isinstance(value, list):
             value = ", ".join(value)
-        insert_kv(text_widget, f"{label}:", value)
+        insert_kv(buf, f"{label}:", value)
 
     emit("modules", item.get("modules"))
     emit("threads", item.get("threads"))
@@ -1316,58 +1963,60 @@ def render_inventory_item(text_widget, item):
     custom = item.get("custom")
     if custom:
         for k, v in custom.items():
-            insert_kv(text_widget, f"{k}:", v, label_tag="custom")
+            insert_kv(buf, f"{k}:", v, label_tag="custom")
+
+    flush_text_buf(text_widget, buf)
 
 def populate_tree_grouped_by_module():
     tree = W("t")
-    tree.delete(*tree.get_children())
-
-    module_index = build_module_index()
-
-    # Optional: collect unmodule'd items
-    ungrouped = []
-
-    for item_id, item in G_INV.items():
-        if not item.get("modules"):
-            ungrouped.append(item_id)
+    children = tree.get_children()
+    if children:  # empty on the boot-time call
+        tree.delete(*children)
+
+    # once per tree row: go straight to Tcl, skipping Treeview.insert's
+    # option-dict formatting
+    tkcall = tree.tk.call
+    tw = tree._w
+    inv = G_INV
+    module_index = G_MODULE_INDEX
+    ungrouped = G_UNGROUPED
 
     # Create module folders
-    for module in sorted(module_index):
+    for module, item_ids in sorted(module_index.items()):
         module_iid = f"module::{module}"
+        leaf_prefix = f"leaf::{module}::"
 
-        tree.insert(
-            "",
-            "end",
-            iid=module_iid,
-            text=module,
-            open=True,
-        )
+        tkcall(tw, "insert", "", "end",
+               "-id", module_iid, "-text", module, "-open", True)
 
-        for item_id in sorted(module_index[module]):
-            leaf_iid = f"leaf::{module}::{item_id}"
-            
-            tree.insert(
-                module_iid,
-                "end",
-                iid=leaf_iid,
-                text=G_INV[item_id]["symbol"],
-                values=(item_id,)
-            )
+        for item_id in item_ids:
+            tkcall(tw, "insert", module_iid, "end",
+                   "-id", leaf_prefix + item_id,
+                   "-text", inv[item_id]["symbol"],
+                   "-values", (item_id,))
 
     # Optional: Ungrouped bucket
     if ungrouped:
-        tree.insert("", "end", iid="module::<none>", text="(no module)", open=True)
-        for item_id in sorted(ungrouped):
-            tree.insert(
-                "module::<none>",
-                "end",
-                iid=item_id,
-                text=G_INV[item_id]["symbol"],
-            )
+        tkcall(tw, "insert", "", "end",
+               "-id", "module::<none>", "-text", "(no module)", "-open", True)
+        for item_id in ungrouped:
+            tkcall(tw, "insert", "module::<none>", "end",
+                   "-id", item_id, "-text", inv[item_id]["symbol"])
 
 
-def dispatch_event(event, handler_fn):
+def dispatch_event(event, handler_fn, pick=True):
+    """
+    Load event into CUR and call handler_fn.
+
+    With pick=False only CUR["event"] is loaded: for handlers that read
+    nothing else, on events that fire in bursts (drag motion, resize),
+    where the 'current' canvas lookup would be a wasted Tcl round trip.
+    """
     CUR["event"] = event
+    if not pick:
+        handler_fn()
+        return
+
     CUR["top"] = top = canvas_top()
     CUR["top_item_id"] = item_id = item_id_for_canvas_item(top) if top else None
     iterate_item(item_id)
@@ -1375,14 +2024,35 @@ def dispatch_event(event, handler_fn):
 
 
 def main():
-    def doit(fn):
+    def doit(fn, pick=True):
         """
         Wrap a handler function so it is called through dispatch_event.
         
         Returns a Tk-compatible callback that first normalizes the event
         into CUR, then invokes the given handler with no arguments.
+        (A partial, not a lambda: no extra Python frame per event.)
         """
-        return lambda e: dispatch_event(e, fn)
+        return partial(dispatch_event, handler_fn=fn, pick=pick)
+    
+    def throttled(fn, ms):
+        """
+        Like doit(), but dispatches at most once every `ms` milliseconds.
+        
+        Events arriving while a dispatch is pending are coalesced; only
+        the most recent one reaches the handler.
+        """
+        pending = {"event": None, "after_id": None}
+        
+        def fire():
+            pending["after_id"] = None
+            dispatch_event(pending["event"], fn)
+        
+        def on_event(e):
+            pending["event"] = e
+            if pending["after_id"] is None:
+                pending["after_id"] = root.after(ms, fire)
+        
+        return on_event
     
     widgets["root"] = root = tk.Tk()
     root.title("Inventory Attachments")
@@ -1444,11 +2114,11 @@ def main():
     tree.bind("<<TreeviewSelect>>", doit(on_tree_select))
 
     canvas.bind("<ButtonPress-1>", doit(on_canvas_button_press))
-    canvas.bind("<B1-Motion>", doit(on_canvas_motion))
-    canvas.bind("<Motion>", doit(on_canvas_hover))
+    canvas.bind("<B1-Motion>", doit(on_canvas_motion, pick=False))
+    canvas.bind("<Motion>", throttled(on_canvas_hover, 16))  # ~one frame
     canvas.bind("<ButtonRelease-1>", doit(on_canvas_button_release))
     canvas.bind("<Leave>", doit(on_canvas_mouse_leaves))
-    canvas.bind("<Configure>", doit(on_canvas_configure))
+    canvas.bind("<Configure>", doit(on_canvas_configure, pick=False))
 
     # -----------------
     # BOOT
@@ -1460,8 +2130,7 @@ def main():
     populate_tree_grouped_by_module()
     
     load_attachments()
-    root.update_idletasks()
-    
+
     root.mainloop()
 
 if __name__ == "__main__":